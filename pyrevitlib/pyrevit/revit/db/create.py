@@ -80,6 +80,8 @@ def create_param_from_definition(param_def,
     doc.ParameterBindings.Insert(param_def,
                                  new_binding,
                                  builtin_param_group)
+    # bindings changed; drop any cached project parameter info
+    query.invalidate_project_parameters(doc=doc)
     return True
 
 
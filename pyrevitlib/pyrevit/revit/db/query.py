@@ -1,7 +1,9 @@
 # -*- coding: utf-8 -*-
 """Helper functions to query info and elements from Revit."""
 #pylint: disable=W0703,C0103,too-many-lines
+import threading
 from collections import namedtuple
+from contextlib import contextmanager
 
 from pyrevit import coreutils
 from pyrevit.coreutils import logger
@@ -20,7 +22,7 @@ from Autodesk.Revit.DB import Element   #pylint: disable=E0401
 mlogger = logger.get_logger(__name__)
 
 
-GRAPHICAL_VIEWTYPES = [
+GRAPHICAL_VIEWTYPES = frozenset([
     DB.ViewType.FloorPlan,
     DB.ViewType.CeilingPlan,
     DB.ViewType.Elevation,
@@ -41,7 +43,7 @@ GRAPHICAL_VIEWTYPES = [
     DB.ViewType.PanelSchedule,
     DB.ViewType.Walkthrough,
     DB.ViewType.Rendering
-]
+])
 
 
 DETAIL_CURVES = (
@@ -174,14 +176,67 @@ def get_biparam_stringequals_filter(bip_paramvalue_dict):
         raise PyRevitException('Error creating filters.')
 
 
-def get_all_elements(doc=None):
-            #  .WhereElementIsNotElementType()\
+_ALL_ELEMENTS_CACHE = {}
+_PARAM_INDEX_CACHE = {}
+_DOC_CATEGORIES_CACHE = {}
+_SCHEDULE_FIELDS_CACHE = {}
+_SESSION_STATE = threading.local()
+
+
+def _session_active():
+    return getattr(_SESSION_STATE, 'depth', 0) > 0
+
+
+@contextmanager
+def session():
+    """Cache expensive model queries for the lifetime of this context.
+
+    While the session is active, repeated calls to :func:`get_all_elements`
+    on the same document reuse the element list collected on the first call
+    instead of re-scanning the model. Callers querying several parameters
+    or value ranges in sequence should wrap the calls in a session:
+
+    Example:
+        >>> with query.session():
+        >>>     marks = query.get_value_range('Mark')
+        >>>     tagged = query.get_elements_by_parameter('Mark', 'A1')
+    """
+    # sessions nest; caches are only dropped when the outermost one exits
+    _SESSION_STATE.depth = getattr(_SESSION_STATE, 'depth', 0) + 1
+    try:
+        yield
+    finally:
+        _SESSION_STATE.depth -= 1
+        if _SESSION_STATE.depth == 0:
+            _ALL_ELEMENTS_CACHE.clear()
+            _PARAM_INDEX_CACHE.clear()
+            _DOC_CATEGORIES_CACHE.clear()
+            _SCHEDULE_FIELDS_CACHE.clear()
+            _PROJECT_PARAMS_CACHE.clear()
+
+
+def iter_all_elements(doc=None):
+    """Iterate over all elements in the model without materializing them.
+
+    Returns the FilteredElementCollector itself; iterating it streams
+    elements one by one instead of copying the whole model into an
+    intermediate list the way ``.ToElements()`` does. Use
+    :func:`get_all_elements` when indexed access is needed.
+    """
     return DB.FilteredElementCollector(doc or DOCS.doc)\
              .WherePasses(
                  DB.LogicalOrFilter(
                      DB.ElementIsElementTypeFilter(False),
-                     DB.ElementIsElementTypeFilter(True)))\
-             .ToElements()
+                     DB.ElementIsElementTypeFilter(True)))
+
+
+def get_all_elements(doc=None):
+    doc = doc or DOCS.doc
+    if _session_active():
+        if id(doc) not in _ALL_ELEMENTS_CACHE:
+            _ALL_ELEMENTS_CACHE[id(doc)] = list(iter_all_elements(doc))
+        return _ALL_ELEMENTS_CACHE[id(doc)]
+    return list(iter_all_elements(doc))
 
 
 def get_all_elements_in_view(view):
@@ -190,64 +245,121 @@ def get_all_elements_in_view(view):
              .ToElements()
 
 
+# storage-type jump table for get_param_value; that function runs once
+# per element on full-model scans, so a single dict probe replaces the
+# chain of enum comparisons
+_PARAM_VALUE_GETTERS = {
+    DB.StorageType.Double: lambda x: x.AsDouble(),
+    DB.StorageType.Integer: lambda x: x.AsInteger(),
+    DB.StorageType.String: lambda x: x.AsString(),
+    DB.StorageType.ElementId: lambda x: x.AsElementId(),
+}
+
+
 def get_param_value(targetparam):
-    value = None
     if isinstance(targetparam, DB.Parameter):
-        if targetparam.StorageType == DB.StorageType.Double:
-            value = targetparam.AsDouble()
-        elif targetparam.StorageType == DB.StorageType.Integer:
-            value = targetparam.AsInteger()
-        elif targetparam.StorageType == DB.StorageType.String:
-            value = targetparam.AsString()
-        elif targetparam.StorageType == DB.StorageType.ElementId:
-            value = targetparam.AsElementId()
+        getter = _PARAM_VALUE_GETTERS.get(targetparam.StorageType, None)
+        return getter(targetparam) if getter else None
     elif isinstance(targetparam, DB.GlobalParameter):
         return targetparam.GetValue().Value
-    return value
 
 
-def get_value_range(param_name, doc=None):
-    values = set()
-    for element in get_all_elements(doc):
+def index_parameter(param_name, doc=None):
+    """Map values of given parameter to the elements carrying each value.
+
+    Walks the model once and buckets every element that has the given
+    parameter by its value; both :func:`get_value_range` and
+    :func:`get_elements_by_parameter` share this single pass. Inside a
+    :func:`session` the built index is cached per document and parameter.
+
+    Args:
+        param_name (str): parameter name
+        doc (DB.Document): target document; default is active document
+
+    Returns:
+        dict: mapping of parameter value to list of elements
+    """
+    doc = doc or DOCS.doc
+    cache_key = (id(doc), param_name)
+    if _session_active() and cache_key in _PARAM_INDEX_CACHE:
+        return _PARAM_INDEX_CACHE[cache_key]
+    value_index = {}
+    # stream the collector when no session cache can be reused
+    elements = \
+        get_all_elements(doc) if _session_active() else iter_all_elements(doc)
+    for element in elements:
         targetparam = element.LookupParameter(param_name)
         if targetparam:
             value = get_param_value(targetparam)
-            if value is not None \
-                    and safe_strtype(value).lower() != 'none':
-                if isinstance(value, str) \
-                        and not value.isspace():
-                    values.add(value)
-                else:
-                    values.add(value)
+            if value is not None:
+                value_index.setdefault(value, []).append(element)
+    if _session_active():
+        _PARAM_INDEX_CACHE[cache_key] = value_index
+    return value_index
+
+
+def get_value_range(param_name, doc=None):
+    values = set()
+    for value in index_parameter(param_name, doc=doc):
+        if safe_strtype(value).lower() != 'none':
+            values.add(value)
     return values
 
 
+def _get_param_value_filter(param_id, param_value):
+    # build a native value-equality filter for the given parameter;
+    # returns None for value types that have no native filter rule
+    pvprov = DB.ParameterValueProvider(param_id)
+    if isinstance(param_value, str):
+        vrule = DB.FilterStringRule(pvprov,
+                                    DB.FilterStringEquals(),
+                                    param_value,
+                                    True)
+    elif isinstance(param_value, float):
+        vrule = DB.FilterDoubleRule(pvprov,
+                                    DB.FilterNumericEquals(),
+                                    param_value,
+                                    1e-9)
+    elif isinstance(param_value, int):
+        vrule = DB.FilterIntegerRule(pvprov,
+                                     DB.FilterNumericEquals(),
+                                     param_value)
+    elif isinstance(param_value, DB.ElementId):
+        vrule = DB.FilterElementIdRule(pvprov,
+                                       DB.FilterNumericEquals(),
+                                       param_value)
+    else:
+        return None
+    return DB.ElementParameterFilter(vrule)
+
+
 def get_elements_by_parameter(param_name, param_value,
                               doc=None, partial=False):
-    # does not work in < 2016
-    # spid = framework.Guid('24353a46-1313-46a4-a779-d33ffe9353ab')
-    # pid = DB.SharedParameterElement.Lookup(revit.doc, spid)
-    # pp = DB.ParameterValueProvider(pid)
-    # pe = DB.FilterStringEquals()
-    # vrule = DB.FilterDoubleRule(pp, pe, scope_id, True)
-    # param_filter = DB.ElementParameterFilter(vrule)
-    # elements = DB.FilteredElementCollector(revit.doc) \
-    #           .WherePasses(param_filter) \
-    #           .ToElementIds()
-
-    found_els = []
-    for element in get_all_elements(doc):
-        targetparam = element.LookupParameter(param_name)
-        if targetparam:
-            value = get_param_value(targetparam)
-            if partial \
-                    and value is not None \
-                    and isinstance(value, str) \
-                    and param_value in value:
-                found_els.append(element)
-            elif param_value == value:
-                found_els.append(element)
-    return found_els
+    doc = doc or DOCS.doc
+    # push exact matches down to a native collector filter when the
+    # parameter name resolves to a project parameter id; this skips the
+    # per-element LookupParameter loop entirely
+    if not partial:
+        try:
+            param_id = get_project_parameter_id(param_name, doc=doc)
+        except PyRevitException:
+            param_id = None
+        if param_id:
+            param_filter = _get_param_value_filter(param_id, param_value)
+            if param_filter:
+                return list(DB.FilteredElementCollector(doc)
+                            .WherePasses(param_filter)
+                            .ToElements())
+
+    # otherwise scan the model in python
+    value_index = index_parameter(param_name, doc=doc)
+    if partial:
+        found_els = []
+        for value, elements in value_index.items():
+            if isinstance(value, str) and param_value in value:
+                found_els.extend(elements)
+        return found_els
+    return list(value_index.get(param_value, []))
 
 
 def get_elements_by_param_value(param_name, param_value,
@@ -271,9 +383,13 @@ def get_elements_by_param_value(param_name, param_value,
 def get_elements_by_categories(element_bicats, elements=None, doc=None):
     # if source elements is provided
     if elements:
+        # builtin category values carry their category id, so compare
+        # integer ids directly instead of resolving each element
+        # category name back to a builtin category
+        target_ids = frozenset(int(x) for x in element_bicats if x)
         return [x for x in elements
-                if get_builtincategory(x.Category.Name)
-                in element_bicats]
+                if x.Category is not None
+                and x.Category.Id.IntegerValue in target_ids]
 
     # otherwise collect from model
     cat_filters = [DB.ElementCategoryFilter(x) for x in element_bicats if x]
@@ -314,32 +430,42 @@ def get_types_by_class(type_class, types=None, doc=None):
             .ToElements()
 
 
+_FAMILY_FILTER_CACHE = {}
+
+
+def _get_family_filter(family_name, symbol_name=None):
+    # ElementParameterFilters are immutable; reuse them across calls so
+    # repeated family lookups skip the CLR filter-rule list construction
+    cache_key = (family_name, symbol_name)
+    famsym_filter = _FAMILY_FILTER_CACHE.get(cache_key)
+    if famsym_filter is None:
+        if len(_FAMILY_FILTER_CACHE) > 128:
+            _FAMILY_FILTER_CACHE.clear()
+        bip_values = \
+            {DB.BuiltInParameter.SYMBOL_FAMILY_NAME_PARAM: family_name}
+        if symbol_name:
+            bip_values[DB.BuiltInParameter.SYMBOL_NAME_PARAM] = symbol_name
+        famsym_filter = get_biparam_stringequals_filter(bip_values)
+        _FAMILY_FILTER_CACHE[cache_key] = famsym_filter
+    return famsym_filter
+
+
+def _get_family_collector(family_name, symbol_name=None,
+                          is_type=True, doc=None):
+    clctr = DB.FilteredElementCollector(doc or DOCS.doc)\
+              .WherePasses(_get_family_filter(family_name, symbol_name))
+    if is_type:
+        return clctr.WhereElementIsElementType()
+    return clctr.WhereElementIsNotElementType()
+
+
 def get_family(family_name, doc=None):
-    families = \
-        DB.FilteredElementCollector(doc or DOCS.doc)\
-          .WherePasses(
-              get_biparam_stringequals_filter(
-                  {DB.BuiltInParameter.SYMBOL_FAMILY_NAME_PARAM: family_name}
-                  )
-              )\
-          .WhereElementIsElementType()\
-          .ToElements()
-    return families
+    return _get_family_collector(family_name, doc=doc).ToElements()
 
 
 def get_family_symbol(family_name, symbol_name, doc=None):
-    famsyms = \
-        DB.FilteredElementCollector(doc or DOCS.doc)\
-          .WherePasses(
-              get_biparam_stringequals_filter(
-                  {
-                      DB.BuiltInParameter.SYMBOL_FAMILY_NAME_PARAM: family_name,
-                      DB.BuiltInParameter.SYMBOL_NAME_PARAM: symbol_name
-                  }
-                  ))\
-          .WhereElementIsElementType()\
-          .ToElements()
-    return famsyms
+    return _get_family_collector(family_name, symbol_name, doc=doc)\
+        .ToElements()
 
 
 def get_families(doc=None, only_editable=True):
@@ -360,58 +486,44 @@ def get_noteblock_families(doc=None):
 
 
 def get_elements_by_family(family_name, doc=None):
-    famsyms = \
-        DB.FilteredElementCollector(doc or DOCS.doc)\
-          .WherePasses(
-              get_biparam_stringequals_filter(
-                  {DB.BuiltInParameter.SYMBOL_FAMILY_NAME_PARAM: family_name}
-                  )
-              )\
-          .WhereElementIsNotElementType()\
-          .ToElements()
-    return famsyms
+    return _get_family_collector(family_name, is_type=False, doc=doc)\
+        .ToElements()
 
 
 def get_elements_by_familytype(family_name, symbol_name, doc=None):
-    syms = \
-        DB.FilteredElementCollector(doc or DOCS.doc)\
-          .WherePasses(
-              get_biparam_stringequals_filter(
-                  {DB.BuiltInParameter.SYMBOL_FAMILY_NAME_PARAM: family_name,
-                   DB.BuiltInParameter.SYMBOL_NAME_PARAM: symbol_name
-                   }
-                  )
-              )\
-          .WhereElementIsNotElementType()\
-          .ToElements()
-    return syms
+    return _get_family_collector(family_name, symbol_name,
+                                 is_type=False, doc=doc)\
+        .ToElements()
 
 
 def find_workset(workset_name_or_list, doc=None, partial=True):
-    workset_clctr = \
-        DB.FilteredWorksetCollector(doc or DOCS.doc).ToWorksets()
+    # iterate the collector directly (no ToWorksets materialization) and
+    # read each workset .Name through the CLR only once
+    workset_clctr = DB.FilteredWorksetCollector(doc or DOCS.doc)
     if isinstance(workset_name_or_list, list):
         for workset in workset_clctr:
-            for workset_name in workset_name_or_list:
-                if workset_name in workset.Name:
-                    return workset
+            workset_name = workset.Name
+            if any(x in workset_name for x in workset_name_or_list):
+                return workset
 
     elif isinstance(workset_name_or_list, str):
-        workset_name = workset_name_or_list
+        target_name = workset_name_or_list
 
         if partial:
             for workset in workset_clctr:
-                if workset_name in workset.Name:
+                if target_name in workset.Name:
                     return workset
         else:
             for workset in workset_clctr:
-                if workset_name == workset.Name:
+                if target_name == workset.Name:
                     return workset
 
 
 def model_has_family(family_name, doc=None):
-    collector = get_family(family_name, doc=doc)
-    return hasattr(collector, 'Count') and collector.Count > 0
+    # FirstElement short-circuits at the first native hit instead of
+    # materializing every matching symbol just to count them
+    return _get_family_collector(family_name, doc=doc)\
+        .FirstElement() is not None
 
 
 def model_has_workset(workset_name, partial=False, doc=None):
@@ -461,17 +573,70 @@ def get_project_parameters(doc=None):
     return pp_list
 
 
+_PROJECT_PARAMS_CACHE = {}
+
+_ProjectParamIndex = namedtuple('_ProjectParamIndex',
+                                ['params', 'by_name', 'by_guid', 'by_id'])
+
+
+def _get_projectparam_index(doc):
+    # indices over the project parameter bindings; building them walks
+    # the ParameterBindings iterator and reads the shared parameter
+    # file. bindings can change through the UI or API at any time, so
+    # like the other caches this one is only kept while a session is
+    # active
+    cache_key = id(doc)
+    if _session_active() and cache_key in _PROJECT_PARAMS_CACHE:
+        return _PROJECT_PARAMS_CACHE[cache_key]
+    params = get_project_parameters(doc)
+    by_name = {}
+    by_guid = {}
+    by_id = {}
+    for project_param in params:
+        by_name[project_param.name] = project_param
+        if project_param.param_guid:
+            by_guid[project_param.param_guid] = project_param
+        if project_param.param_id:
+            by_id[project_param.param_id.IntegerValue] = project_param
+    pp_index = _ProjectParamIndex(params, by_name, by_guid, by_id)
+    if _session_active():
+        _PROJECT_PARAMS_CACHE[cache_key] = pp_index
+    return pp_index
+
+
+def invalidate_project_parameters(doc=None):
+    """Drop cached project parameter info for given document.
+
+    pyrevit.revit.db.create calls this after inserting new parameter
+    bindings so queries inside an active :func:`session` see the new
+    parameters; scripts modifying doc.ParameterBindings directly
+    should call it as well.
+    """
+    doc = doc or DOCS.doc
+    _PROJECT_PARAMS_CACHE.pop(id(doc), None)
+
+
 def get_project_parameter_id(param_name, doc=None):
     doc = doc or DOCS.doc
-    for project_param in get_project_parameters(doc):
-        if project_param.name == param_name:
-            return project_param.param_id
+    project_param = _get_projectparam_index(doc).by_name.get(param_name, None)
+    if project_param:
+        return project_param.param_id
     raise PyRevitException('Parameter not found: {}'.format(param_name))
 
 
 def get_project_parameter(param_id_or_name, doc=None):
-    pp_list = get_project_parameters(doc or DOCS.doc)
-    for msp in pp_list:
+    pp_index = _get_projectparam_index(doc or DOCS.doc)
+    # dispatch common lookup types into the prebuilt indices
+    if isinstance(param_id_or_name, DB.ElementId):
+        return pp_index.by_id.get(param_id_or_name.IntegerValue, None)
+    elif isinstance(param_id_or_name, str):
+        guid = coreutils.extract_guid(param_id_or_name)
+        if guid and guid in pp_index.by_guid:
+            return pp_index.by_guid[guid]
+        elif param_id_or_name in pp_index.by_name:
+            return pp_index.by_name[param_id_or_name]
+    # fall back to wrapper equality for anything else
+    for msp in pp_index.params:
         if msp == param_id_or_name:
             return msp
 
@@ -506,7 +671,19 @@ def get_revisions(doc=None):
 
 def get_sheet_revisions(sheet):
     doc = sheet.Document
-    return [doc.GetElement(x) for x in sheet.GetAdditionalRevisionIds()]
+    rev_ids = sheet.GetAdditionalRevisionIds()
+    if rev_ids.Count == 0:
+        return []
+    # resolve all revisions in one batch collector traversal instead of
+    # a GetElement round-trip per id
+    rev_elements = {
+        x.Id: x
+        for x in DB.FilteredElementCollector(
+            doc,
+            framework.List[DB.ElementId](rev_ids)
+            ).WhereElementIsNotElementType()
+        }
+    return [rev_elements.get(x, None) for x in rev_ids]
 
 
 def get_current_sheet_revision(sheet):
@@ -543,9 +720,22 @@ def get_links(linktype=None, doc=None):
     try:
         trans_data = DB.TransmissionData.ReadTransmissionData(model_path)
         external_refs = trans_data.GetAllExternalFileReferenceIds()
+        # resolve all reference elements in one batch collector
+        # traversal; reference elements can be types (e.g. link types)
+        # so pass both type and non-type elements
+        ref_elements = {}
+        if external_refs.Count > 0:
+            ref_clctr = DB.FilteredElementCollector(
+                doc,
+                framework.List[DB.ElementId](external_refs)
+                ).WherePasses(
+                    DB.LogicalOrFilter(
+                        DB.ElementIsElementTypeFilter(False),
+                        DB.ElementIsElementTypeFilter(True)))
+            ref_elements = {x.Id: x for x in ref_clctr}
         for ref_id in external_refs:
             ext_ref = trans_data.GetLastSavedReferenceData(ref_id)
-            link = doc.GetElement(ref_id)
+            link = ref_elements.get(ref_id, None)
             if linktype:
                 if ext_ref.ExternalFileReferenceType == linktype:
                     links.append(db.ExternalRef(link, ext_ref))
@@ -609,10 +799,11 @@ def get_all_views(doc=None, view_types=None, include_nongraphical=False):
         all_views = [x for x in all_views if x.ViewType in view_types]
 
     if not include_nongraphical:
+        # cheap boolean reads first; the viewtype enum probe last
         return [x for x in all_views
-                if x.ViewType in GRAPHICAL_VIEWTYPES
-                and not x.IsTemplate
-                and not x.ViewSpecific]
+                if not x.IsTemplate
+                and not x.ViewSpecific
+                and x.ViewType in GRAPHICAL_VIEWTYPES]
 
     return all_views
 
@@ -713,30 +904,41 @@ def get_all_referencing_elements_in_view(view):
 
 def get_schedules_on_sheet(viewsheet, doc=None):
     doc = doc or DOCS.doc
-    all_sheeted_scheds = DB.FilteredElementCollector(doc)\
-                           .OfClass(DB.ScheduleSheetInstance)\
-                           .ToElements()
-    return [x for x in all_sheeted_scheds
-            if x.OwnerViewId == viewsheet.Id
-            and not doc.GetElement(x.ScheduleId).IsTitleblockRevisionSchedule]
+    # scope the collector to the sheet so revit filters on OwnerViewId
+    # natively instead of collecting every instance in the model
+    sheeted_scheds = DB.FilteredElementCollector(doc, viewsheet.Id)\
+                       .OfClass(DB.ScheduleSheetInstance)\
+                       .ToElements()
+    # resolve each distinct schedule only once
+    tblock_rev_scheds = set()
+    for sched_id in {x.ScheduleId for x in sheeted_scheds}:
+        if doc.GetElement(sched_id).IsTitleblockRevisionSchedule:
+            tblock_rev_scheds.add(sched_id)
+    return [x for x in sheeted_scheds
+            if x.ScheduleId not in tblock_rev_scheds]
 
 
 def is_sheet_empty(viewsheet):
-    sheet_views = viewsheet.GetAllViewports()
-    sheet_scheds = get_schedules_on_sheet(viewsheet, doc=viewsheet.Document)
-    if sheet_views or sheet_scheds:
+    # GetAllViewports is a cheap id-collection read; only run the
+    # schedule collector when the sheet has no viewports at all
+    if viewsheet.GetAllViewports():
         return False
-    return True
+    return not get_schedules_on_sheet(viewsheet, doc=viewsheet.Document)
 
 
 def get_doc_categories(doc=None, include_subcats=True):
     doc = doc or DOCS.doc
+    cache_key = (id(doc), include_subcats)
+    if _session_active() and cache_key in _DOC_CATEGORIES_CACHE:
+        return _DOC_CATEGORIES_CACHE[cache_key]
     all_cats = []
     cats = doc.Settings.Categories
     all_cats.extend(cats)
     if include_subcats:
         for cat in cats:
             all_cats.extend([x for x in cat.SubCategories])
+    if _session_active():
+        _DOC_CATEGORIES_CACHE[cache_key] = all_cats
     return all_cats
 
 
@@ -788,6 +990,21 @@ def get_category(cat_name_or_builtin, doc=None):
         return cat_name_or_builtin
 
 
+_BICAT_BY_INT = None
+
+
+def _get_bicat_index():
+    # the builtin category enum never changes at runtime, so the
+    # int-to-value index is built once and kept for the session
+    global _BICAT_BY_INT
+    if _BICAT_BY_INT is None:
+        _BICAT_BY_INT = {
+            int(x): x
+            for x in DB.BuiltInCategory.GetValues(DB.BuiltInCategory)
+            }
+    return _BICAT_BY_INT
+
+
 def get_builtincategory(cat_name_or_id, doc=None):
     doc = doc or DOCS.doc
     cat_id = None
@@ -798,9 +1015,7 @@ def get_builtincategory(cat_name_or_id, doc=None):
     elif isinstance(cat_name_or_id, DB.ElementId):
         cat_id = cat_name_or_id.IntegerValue
     if cat_id:
-        for bicat in DB.BuiltInCategory.GetValues(DB.BuiltInCategory):
-            if int(bicat) == cat_id:
-                return bicat
+        return _get_bicat_index().get(cat_id, None)
 
 
 def get_subcategories(doc=None, purgable=False, filterfunc=None):
@@ -882,40 +1097,117 @@ def get_all_grids(group_by_direction=False,
                 ))
 
     if group_by_direction:
-        direcs = {db.XYZPoint(x.Curve.Direction) for x in all_grids}
+        # single pass; one XYZPoint wrap and one hash per grid
         grouped_grids = {}
-        for direc in direcs:
-            grouped_grids[direc] = [x for x in all_grids
-                                    if direc == db.XYZPoint(x.Curve.Direction)]
+        for grid in all_grids:
+            direc = db.XYZPoint(grid.Curve.Direction)
+            grouped_grids.setdefault(direc, []).append(grid)
         return grouped_grids
     return all_grids
 
 
+def _get_direction_key(direction):
+    # bucket key that is only equal for genuinely parallel directions:
+    # exact components rounded to a few decimals (db.XYZPoint rounds to
+    # whole numbers and would collapse non-parallel directions), with
+    # the sign canonicalized so antiparallel lines share a bucket
+    dir_x, dir_y, dir_z = direction.X, direction.Y, direction.Z
+    if dir_x < 0 \
+            or (dir_x == 0 and dir_y < 0) \
+            or (dir_x == 0 and dir_y == 0 and dir_z < 0):
+        dir_x, dir_y, dir_z = -dir_x, -dir_y, -dir_z
+    return (round(dir_x, 6), round(dir_y, 6), round(dir_z, 6))
+
+
 def get_gridpoints(grids=None, include_linked_models=False, doc=None):
     doc = doc or DOCS.doc
     source_grids = grids or get_all_grids(
         doc=doc,
         include_linked_models=include_linked_models
         )
+    # bucket line grids by direction first; parallel line grids can
+    # never overlap so only cross-direction pairs need an intersection
+    # test. radial (arc) grids have no direction and are kept in a
+    # catch-all bucket tested against every other grid
+    dir_buckets = {}
+    nonline_grids = []
+    for grid in source_grids:
+        curve = grid.Curve
+        if isinstance(curve, DB.Line):
+            dir_buckets.setdefault(_get_direction_key(curve.Direction), [])\
+                       .append(grid)
+        else:
+            nonline_grids.append(grid)
+
     gints = {}
-    for grid1 in source_grids:
-        for grid2 in source_grids:
-            results = framework.clr.Reference[DB.IntersectionResultArray]()
-            intres = grid1.Curve.Intersect(grid2.Curve, results)
-            if intres == DB.SetComparisonResult.Overlap:
-                gints[db.XYZPoint(results.get_Item(0).XYZPoint)] = \
-                    [grid1, grid2]
+    results = framework.clr.Reference[DB.IntersectionResultArray]()
+
+    def record_intersections(grids1, grids2):
+        for grid1 in grids1:
+            for grid2 in grids2:
+                intres = grid1.Curve.Intersect(grid2.Curve, results)
+                if intres == DB.SetComparisonResult.Overlap:
+                    gints[db.XYZPoint(results.get_Item(0).XYZPoint)] = \
+                        [grid1, grid2]
+
+    buckets = list(dir_buckets.values())
+    for idx, bucket in enumerate(buckets):
+        for other_bucket in buckets[idx + 1:]:
+            record_intersections(bucket, other_bucket)
+        record_intersections(bucket, nonline_grids)
+    for idx, grid in enumerate(nonline_grids):
+        record_intersections([grid], nonline_grids[idx + 1:])
     return [GridPoint(point=k, grids=v) for k, v in gints.items()]
 
 
-def get_closest_gridpoint(element, gridpoints):
-    dist = (gridpoints[0].point.unwrap().DistanceTo(element.Location.Point),
-            gridpoints[0])
+def _get_gridpoint_coords(gridpoints):
+    # read each gridpoint coordinate through the CLR once; the resulting
+    # tuples are compared in pure python afterwards
+    coords = []
     for grid_point in gridpoints:
-        gp_dist = grid_point.point.unwrap().DistanceTo(element.Location.Point)
-        if gp_dist < dist[0]:
-            dist = (gp_dist, grid_point)
-    return dist[1]
+        gp_point = grid_point.point.unwrap()
+        coords.append((gp_point.X, gp_point.Y, gp_point.Z))
+    return coords
+
+
+def _get_closest_coord_index(coords, point):
+    point_x, point_y, point_z = point.X, point.Y, point.Z
+    closest_idx = 0
+    closest_dist = None
+    for idx, (gp_x, gp_y, gp_z) in enumerate(coords):
+        gp_dist = (gp_x - point_x) ** 2 \
+            + (gp_y - point_y) ** 2 \
+            + (gp_z - point_z) ** 2
+        if closest_dist is None or gp_dist < closest_dist:
+            closest_dist = gp_dist
+            closest_idx = idx
+    return closest_idx
+
+
+def get_closest_gridpoint(element, gridpoints):
+    coords = _get_gridpoint_coords(gridpoints)
+    return gridpoints[
+        _get_closest_coord_index(coords, element.Location.Point)
+        ]
+
+
+def get_closest_gridpoints(elements, gridpoints):
+    """Find the closest gridpoint for each of the given elements.
+
+    Extracts the gridpoint coordinates once and reuses them for all
+    elements; prefer this over calling :func:`get_closest_gridpoint`
+    per element.
+
+    Args:
+        elements (list[DB.Element]): elements with point locations
+        gridpoints (list[GridPoint]): gridpoints to search
+
+    Returns:
+        list[GridPoint]: closest gridpoint for each element, in order
+    """
+    coords = _get_gridpoint_coords(gridpoints)
+    return [gridpoints[_get_closest_coord_index(coords, x.Location.Point)]
+            for x in elements]
 
 
 def get_category_set(category_list, doc=None):
@@ -949,43 +1241,68 @@ def get_rule_filters(doc=None):
 
 
 def get_connected_circuits(element, spare=False, space=False):
-    circuit_types = [DB.Electrical.CircuitType.Circuit]
+    circuit_types = {DB.Electrical.CircuitType.Circuit}
     if spare:
-        circuit_types.append(DB.Electrical.CircuitType.Spare)
+        circuit_types.add(DB.Electrical.CircuitType.Spare)
     if space:
-        circuit_types.append(DB.Electrical.CircuitType.Space)
+        circuit_types.add(DB.Electrical.CircuitType.Space)
 
-    if element.MEPModel and element.MEPModel.ElectricalSystems:
-        return [x for x in element.MEPModel.ElectricalSystems
-                if x.CircuitType in circuit_types]
+    # read the MEPModel/ElectricalSystems properties once
+    mep_model = element.MEPModel
+    elec_systems = mep_model.ElectricalSystems if mep_model else None
+    if elec_systems:
+        return [x for x in elec_systems if x.CircuitType in circuit_types]
 
 
 def get_element_categories(elements):
-    catsdict = {x.Category.Name: x.Category for x in elements}
-    uniquenames = set(catsdict.keys())
-    return [catsdict[x] for x in uniquenames]
+    # dedupe on the integer category id; reading .Id.IntegerValue is a
+    # cheap int marshal vs building a .Name string for every element
+    catsdict = {}
+    for element in elements:
+        cat = element.Category
+        if cat:
+            catsdict[cat.Id.IntegerValue] = cat
+    return list(catsdict.values())
 
 
 def get_category_schedules(category_or_catname, doc=None):
     doc = doc or DOCS.doc
-    cat = get_category(category_or_catname)
-    scheds = get_all_schedules(doc=doc)
-    return [x for x in scheds if x.Definition.CategoryId == cat.Id]
+    cat = get_category(category_or_catname, doc=doc)
+    # compare integer ids; ElementId equality goes through method
+    # dispatch on every schedule
+    cat_id = cat.Id.IntegerValue
+    return [x for x in get_all_schedules(doc=doc)
+            if x.Definition.CategoryId.IntegerValue == cat_id]
+
+
+def _get_schedule_fields(schedule):
+    # name-to-field mapping; walking the field order calls
+    # GetField/GetName through the CLR per field, so inside a session
+    # the mapping is cached per schedule
+    cache_key = (id(schedule.Document), schedule.Id.IntegerValue)
+    if _session_active() and cache_key in _SCHEDULE_FIELDS_CACHE:
+        return _SCHEDULE_FIELDS_CACHE[cache_key]
+    sched_def = schedule.Definition
+    fields = {}
+    for field_idx in sched_def.GetFieldOrder():
+        field = sched_def.GetField(field_idx)
+        fields.setdefault(field.GetName(), field)
+    if _session_active():
+        _SCHEDULE_FIELDS_CACHE[cache_key] = fields
+    return fields
 
 
 def get_schedule_field(schedule, field_name):
-    for field_idx in schedule.Definition.GetFieldOrder():
-        field = schedule.Definition.GetField(field_idx)
-        if field.GetName() == field_name:
-            return field
+    return _get_schedule_fields(schedule).get(field_name, None)
 
 
 def get_schedule_filters(schedule, field_name, return_index=False):
     matching_filters = []
     field = get_schedule_field(schedule, field_name)
     if field:
+        field_id = field.FieldId
         for idx, sfilter in enumerate(schedule.Definition.GetFilters()):
-            if sfilter.FieldId == field.FieldId:
+            if sfilter.FieldId == field_id:
                 if return_index:
                     matching_filters.append(idx)
                 else: